@@ -115,15 +115,17 @@ def clear_directory(dir_path):
         print(f"{dir_path} не является директорией")
         return
     
-    for filename in os.listdir(dir_path):
-        file_path = os.path.join(dir_path, filename)
-        try:
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-            elif os.path.isdir(file_path):
-                shutil.rmtree(file_path)
-        except Exception as e:
-            print(f"Ошибка удаления {file_path}: {e}")
+    # Файлы удаляются пулом потоков (см. 5.4), подкаталоги - shutil.rmtree
+    report = clean_directory(dir_path)
+    for path, error in report["errors"]:
+        print(f"Ошибка удаления {path}: {error}")
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                try:
+                    shutil.rmtree(entry.path)
+                except Exception as e:
+                    print(f"Ошибка удаления {entry.path}: {e}")
 
 # clear_directory("temp_folder")
 
@@ -142,35 +144,125 @@ def clean_temp_files():
     for temp_dir in temp_dirs:
         if os.path.exists(temp_dir):
             print(f"Очистка {temp_dir}")
-            for file in os.listdir(temp_dir):
-                file_path = os.path.join(temp_dir, file)
-                try:
-                    if os.path.isfile(file_path):
-                        os.remove(file_path)
-                        print(f"Удален файл: {file}")
-                except Exception as e:
-                    print(f"Ошибка удаления {file_path}: {e}")
+            report = clean_directory(temp_dir)
+            print(f"Удалено файлов: {report['deleted']}, освобождено байт: {report['bytes']}")
+            for path, error in report["errors"]:
+                print(f"Ошибка удаления {path}: {error}")
 
 # clean_temp_files()
 
 # 5.2 Удаление устаревших файлов
 import time
-def delete_old_files(directory, days=30):
-    now = time.time()
-    cutoff = now - (days * 86400)
-    
-    for filename in os.listdir(directory):
-        file_path = os.path.join(directory, filename)
-        if os.path.isfile(file_path):
-            file_time = os.path.getmtime(file_path)
-            if file_time < cutoff:
-                try:
-                    os.remove(file_path)
-                    print(f"Удален устаревший файл: {filename}")
-                except Exception as e:
-                    print(f"Ошибка удаления {file_path}: {e}")
+def delete_old_files(directory, days=30, dry_run=False):
+    report = clean_directory(directory, older_than_days=days, dry_run=dry_run)
+    action = "Будет удалено" if dry_run else "Удалено"
+    print(f"{action} устаревших файлов: {report['matched']}, байт: {report['bytes']}")
+    for path, error in report["errors"]:
+        print(f"Ошибка удаления {path}: {error}")
+    return report
 
 # delete_old_files("logs", days=7)
+# delete_old_files("logs", days=7, dry_run=True)  # Только отчет, без удаления
+
+# 5.4 Массовая очистка: os.scandir + пул потоков
+# DirEntry.stat() берет данные, уже полученные при чтении каталога (Windows)
+# или делает один lstat (Linux) - вместо отдельных isfile() и getmtime().
+# Удаление (os.remove) отпускает GIL, поэтому пул потоков ускоряет его на сетевых ФС
+# и медленных дисках; на локальном tmpfs быстрее workers=1 - проверьте benchmark_cleanup().
+# Политики: возраст (older_than_days), размер (min_size/max_size), шаблон имени (pattern)
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+        return None
+    except OSError as e:
+        return e
+
+def clean_directory(directory, older_than_days=None, min_size=None, max_size=None,
+                    pattern=None, recursive=False, dry_run=False, workers=16):
+    # Возвращает отчет: {"matched", "deleted", "bytes", "errors": [(путь, ошибка)]}
+    # dry_run=True - только посчитать, что и сколько байт будет освобождено
+    cutoff = time.time() - older_than_days * 86400 if older_than_days is not None else None
+    candidates = []
+    total_bytes = 0
+    directories = [directory]
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        directories.append(entry.path)
+                    continue
+                # Симлинк (на файл, каталог или битый) удаляется сам, цель не трогается
+                if not (entry.is_file(follow_symlinks=False) or entry.is_symlink()):
+                    continue
+                if pattern is not None and not fnmatch.fnmatch(entry.name, pattern):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                if cutoff is not None and stat.st_mtime >= cutoff:
+                    continue
+                if min_size is not None and stat.st_size < min_size:
+                    continue
+                if max_size is not None and stat.st_size > max_size:
+                    continue
+                candidates.append((entry.path, stat.st_size))
+
+    report = {"matched": len(candidates), "deleted": 0, "bytes": 0, "errors": []}
+    if dry_run:
+        report["bytes"] = sum(size for _, size in candidates)
+        return report
+
+    paths = [path for path, _ in candidates]
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_remove_file, paths))
+    else:
+        results = map(_remove_file, paths)  # Локальный быстрый диск: потоки могут не окупиться
+    for (path, size), error in zip(candidates, results):
+        if error is None:
+            report["deleted"] += 1
+            report["bytes"] += size
+        else:
+            report["errors"].append((path, error))
+    return report
+
+# report = clean_directory("temp_files", pattern="*.tmp", older_than_days=1, dry_run=True)
+# print(f"Будет удалено {report['matched']} файлов, {report['bytes'] / 2**20:.1f} МБ")
+# clean_directory("cache", min_size=100 * 2**20, recursive=True)
+
+# 5.4.1 Сравнение скорости удаления (наш реальный сценарий - 1 млн мелких файлов)
+def benchmark_cleanup(count=100_000, workers=16):
+    import tempfile
+
+    def make_files(directory):
+        for i in range(count):
+            with open(os.path.join(directory, f"{i}.tmp"), "wb") as f:
+                f.write(b"x")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        make_files(tmp_dir)
+        start = time.perf_counter()
+        # Последовательный вариант, как в исходном delete_old_files (без print)
+        for filename in os.listdir(tmp_dir):
+            file_path = os.path.join(tmp_dir, filename)
+            if os.path.isfile(file_path) and os.path.getmtime(file_path) < time.time():
+                os.remove(file_path)
+        serial = time.perf_counter() - start
+
+        timings = {}
+        for threads in (1, workers):
+            make_files(tmp_dir)
+            start = time.perf_counter()
+            clean_directory(tmp_dir, older_than_days=0, workers=threads)
+            timings[threads] = time.perf_counter() - start
+
+    print(f"listdir + isfile + getmtime + remove: {serial:.2f} с")
+    for threads, elapsed in timings.items():
+        print(f"clean_directory, потоков: {threads:>3}: {elapsed:.2f} с (x{serial / elapsed:.1f})")
+
+# benchmark_cleanup(1_000_000)
 
 # 5.3 Полное удаление приложения
 def uninstall_app(app_dir):
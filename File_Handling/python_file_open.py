@@ -114,14 +114,18 @@ with open("copy.jpg", "wb") as copy_file:
 # =============================================
 
 # 5.1 Чтение больших файлов
-def process_large_file(filename):
+def process_large_file(filename, chunk_size=1024, callback=None):
+    # callback(chunk) - обработчик чанка вместо print()
+    # Для многогигабайтных файлов см. режим mmap (use_mmap=True) в python_reads_file.py
+    if callback is None:
+        callback = lambda chunk: print(chunk, end="")
     with open(filename, "r") as file:
         while True:
-            chunk = file.read(1024)  # Чтение по 1 КБ
+            chunk = file.read(chunk_size)  # Чтение по chunk_size символов (по умолчанию 1024)
             if not chunk:
                 break
             # Обработка чанка данных
-            print(chunk, end="")
+            callback(chunk)
 
 # 5.2 Работа с CSV
 import csv
@@ -146,6 +150,8 @@ def log_message(message, filename="app.log"):
         log_file.write(f"[{timestamp}] {message}\n")
 
 # log_message("Запуск приложения")
+# Под нагрузкой используйте BatchLogger из python_files_write.py:
+# он не открывает файл на каждое сообщение и пишет пачками в фоне
 
 # 6.2 Конфигурационный файл
 def load_config(filename="config.json"):
@@ -157,6 +163,127 @@ def load_config(filename="config.json"):
 
 # config = load_config()
 
+# 6.2.1 Кэш конфигурации с горячей перезагрузкой
+# load_config() читает и парсит файл при каждом вызове. ConfigManager парсит его
+# один раз и отдает неизменяемый снимок (MappingProxyType). Не чаще раза
+# в check_interval секунд он сверяет (mtime, размер) файла и при изменении
+# перечитывает его; новый снимок подменяет старый одной операцией присваивания.
+# Подписчики получают множество изменившихся ключей
+import threading
+import time
+from types import MappingProxyType
+
+def _freeze(value):
+    # Вложенные словари и списки тоже делаем неизменяемыми
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+class ConfigManager:
+    def __init__(self, filename="config.json", defaults=None, check_interval=1.0):
+        self.filename = filename
+        self.defaults = defaults or {"debug": False, "max_connections": 10}
+        self.check_interval = check_interval
+        self._subscribers = []
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        self._signature = None
+        self._snapshot = MappingProxyType({})
+        self._next_check = 0.0
+        self.reload()
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.filename)
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def reload(self):
+        with self._reload_lock:
+            signature = self._file_signature()
+            if signature is None:
+                data = self.defaults
+            else:
+                try:
+                    with open(self.filename, "r") as config_file:
+                        data = json.load(config_file)
+                except ValueError as e:
+                    # Файл сохранен наполовину или с ошибкой - оставляем прежний снимок
+                    print(f"Ошибка конфигурации {self.filename}: {e}")
+                    return self._snapshot
+            old, new = self._snapshot, _freeze(data)
+            self._snapshot, self._signature = new, signature
+        changed = {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+        if changed:
+            for callback in self._subscribers:
+                callback(changed, new)
+        return new
+
+    def snapshot(self):
+        # Дешевая проверка: stat не чаще раза в check_interval секунд
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            if self._file_signature() != self._signature:
+                self.reload()
+        return self._snapshot
+
+    def get(self, key, default=None):
+        return self.snapshot().get(key, default)
+
+    def __getitem__(self, key):
+        return self.snapshot()[key]
+
+    def subscribe(self, callback):
+        # callback(changed_keys, snapshot)
+        self._subscribers.append(callback)
+
+    def start_watcher(self):
+        # Фоновый поток сам перечитывает файл - запросы всегда видят готовый снимок
+        def watch():
+            while not self._stop.wait(self.check_interval):
+                if self._file_signature() != self._signature:
+                    self.reload()
+
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=watch, name="ConfigWatcher", daemon=True)
+            self._watcher.start()
+
+    def stop_watcher(self):
+        if self._watcher is not None:
+            self._stop.set()
+            self._watcher.join()
+            self._watcher = None
+            self._stop.clear()
+
+# config = ConfigManager("config.json")
+# config.subscribe(lambda keys, snapshot: print(f"Изменились ключи: {keys}"))
+# config.start_watcher()
+# if config.get("debug"):
+#     print("Режим отладки")
+
+# 6.2.2 Сравнение: чтений в секунду
+def benchmark_config(count=100_000, filename="config.json"):
+    start = time.perf_counter()
+    for _ in range(count):
+        load_config(filename).get("debug")
+    plain = time.perf_counter() - start
+
+    config = ConfigManager(filename)
+    start = time.perf_counter()
+    for _ in range(count):
+        config.get("debug")
+    cached = time.perf_counter() - start
+
+    print(f"load_config():        {count / plain:,.0f} чтений/с")
+    print(f"ConfigManager.get():  {count / cached:,.0f} чтений/с (x{plain / cached:.0f})")
+
+# benchmark_config()
+
 # 6.3 Резервное копирование
 def backup_file(filename):
     import time
@@ -166,6 +293,8 @@ def backup_file(filename):
     return backup_name
 
 # backup = backup_file("important.txt")
+# Для частых копий больших файлов см. BackupStore в python_files_write.py:
+# хранит только изменившиеся чанки и пропускает неизмененные файлы
 
 # 6.4 Поиск файлов
 def find_files(extension, directory="."):
@@ -177,6 +306,83 @@ def find_files(extension, directory="."):
 # for py_file in find_files(".py"):
 #     print(py_file)
 
+# 6.5 Быстрый поиск: os.scandir, параллельный обход и индекс на диске
+# - scandir отдает тип записи без отдельного stat на каждое имя
+# - подкаталоги сканируются пулом потоков
+# - patterns - шаблоны fnmatch или расширения ("*.py", "test_*", ".py")
+# - ignore - шаблоны fnmatch для имен каталогов/файлов (".git", "__pycache__", "*.tmp")
+# - index_path - JSON с содержимым каталогов и их mtime: при повторном поиске
+#   заново читаются только каталоги, в которых что-то добавили/удалили/переименовали
+import fnmatch
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+def _compile_patterns(patterns, extensions=False):
+    # Один regex на все шаблоны (пустой список - функция, которая ничего не совпадает);
+    # extensions=True: ".py" понимается как "*.py" (как в find_files). Для ignore
+    # это не делается: ".git" должно совпадать только с самим ".git"
+    globs = [f"*{p}" if extensions and p.startswith(".") and not any(c in p for c in "*?[") else p
+             for p in patterns]
+    if not globs:
+        return lambda name: None
+    return re.compile("|".join(fnmatch.translate(g) for g in globs)).match
+
+def _scan_directory(path, cached=None):
+    mtime_ns = os.stat(path).st_mtime_ns
+    if cached is not None and cached["mtime_ns"] == mtime_ns:
+        return cached  # Каталог не менялся - содержимое берем из индекса
+    files, dirs = [], []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                elif entry.is_file():
+                    files.append(entry.name)
+            except OSError:
+                continue
+    return {"mtime_ns": mtime_ns, "files": files, "dirs": dirs}
+
+def scan_files(patterns, directory=".", ignore=(), workers=8, index_path=None):
+    match = _compile_patterns(patterns, extensions=True)
+    ignored = _compile_patterns(ignore)
+
+    index = {}
+    if index_path and os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as index_file:
+            index = json.load(index_file)
+    new_index = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_scan_directory, directory, index.get(directory)): directory}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    entry = future.result()
+                except OSError:
+                    continue  # Каталог удален или нет прав
+                new_index[path] = entry
+                for name in entry["dirs"]:
+                    if not ignored(name):
+                        subdir = os.path.join(path, name)
+                        pending[pool.submit(_scan_directory, subdir, index.get(subdir))] = subdir
+                for name in entry["files"]:
+                    if match(name) and not ignored(name):
+                        yield os.path.join(path, name)
+
+    # Индекс сохраняется только после полного обхода (устаревшие каталоги выпадают)
+    if index_path:
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as index_file:
+            json.dump(new_index, index_file)
+        os.replace(tmp_path, index_path)
+
+# for py_file in scan_files([".py", "*.pyi"], ".", ignore=[".git", "__pycache__"],
+#                           index_path=".find_index.json"):
+#     print(py_file)
+
 """
 КЛЮЧЕВЫЕ ТЕЗИСЫ:
 1. Основные операции:
@@ -115,17 +115,190 @@ def log_message(message, filename="app.log"):
 # log_message("Пользователь вошел в систему")
 # log_message("Ошибка: файл не найден", "error.log")
 
+# 5.1.1 Пакетный логгер с фоновой записью
+# log_message() открывает и закрывает файл на каждое сообщение.
+# BatchLogger держит файл открытым, копит строки в памяти и сбрасывает их
+# фоновым потоком: когда набралось max_batch записей или прошло flush_interval секунд
+import atexit
+import threading
+import time
+
+class BatchLogger:
+    def __init__(self, filename="app.log", max_batch=1000, flush_interval=1.0):
+        self.filename = filename
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._file = open(filename, 'a', encoding='utf-8')
+        self._queue = []
+        self._queue_lock = threading.Lock()
+        self._write_lock = threading.Lock()  # Пачки пишутся в файл по порядку
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._timestamp = (None, "")  # (секунда, готовая строка) - strftime раз в секунду
+        self._thread = threading.Thread(target=self._run, name="BatchLogger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)  # Досбросить очередь при выходе из программы
+
+    def _format_time(self):
+        second = int(time.time())
+        cached_second, text = self._timestamp
+        if second != cached_second:
+            text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+            self._timestamp = (second, text)
+        return text
+
+    def log(self, message):
+        if self._closed:
+            raise ValueError("Логгер закрыт")
+        line = f"[{self._format_time()}] {message}\n"
+        with self._queue_lock:
+            self._queue.append(line)
+            full = len(self._queue) >= self.max_batch
+        if full:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            with self._queue_lock:
+                batch, self._queue = self._queue, []
+            if batch:
+                self._file.write("".join(batch))
+                self._file.flush()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+        self._file.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# with BatchLogger("app.log") as logger:
+#     logger.log("Запуск приложения")
+#     logger.log("Пользователь вошел в систему")
+
+# 5.1.2 Сравнение пропускной способности
+def benchmark_logger(count=100_000):
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "plain.log")
+        start = time.perf_counter()
+        for i in range(count):
+            log_message(f"Сообщение {i}", path)
+        plain = time.perf_counter() - start
+
+        path = os.path.join(tmp_dir, "batch.log")
+        start = time.perf_counter()
+        with BatchLogger(path) as logger:
+            for i in range(count):
+                logger.log(f"Сообщение {i}")
+        batched = time.perf_counter() - start
+
+    print(f"log_message: {count / plain:,.0f} записей/с")
+    print(f"BatchLogger: {count / batched:,.0f} записей/с (x{plain / batched:.1f})")
+
+# benchmark_logger()
+
 # 5.2 Экспорт данных в CSV
-def export_to_csv(data, filename):
-    with open(filename, 'w', encoding='utf-8') as file:
-        # Запись заголовков
-        headers = ",".join(data[0].keys())
-        file.write(headers + "\n")
-        
-        # Запись данных
-        for item in data:
-            values = ",".join(str(v) for v in item.values())
-            file.write(values + "\n")
+# data - любой итерируемый объект словарей (список, генератор, курсор БД):
+# строки пишутся пачками по batch_size, в памяти держится только одна пачка.
+# Кавычки и экранирование делает модуль csv (dialect='excel' по умолчанию)
+import csv
+import io
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def _format_csv_batch(rows, fieldnames, dialect, extrasaction):
+    # Выполняется в процессе-воркере: пачка словарей -> готовый текст CSV
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames, dialect=dialect, restval="",
+                   extrasaction=extrasaction).writerows(rows)
+    return buffer.getvalue()
+
+def _read_umask():
+    # Текущая маска прав; узнать ее можно только установив новую. Читается один
+    # раз при импорте: менять umask во время работы нельзя - файлы, созданные
+    # в этот момент другими потоками (BatchLogger и т.п.), получат права 0666
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+UMASK = _read_umask()
+
+def export_to_csv(data, filename, fieldnames=None, batch_size=10_000, dialect='excel', workers=0,
+                  extrasaction='ignore'):
+    # workers > 0 - форматировать пачки в процессах (для очень широких таблиц);
+    # в работе одновременно не больше 2 * workers пачек, порядок строк сохраняется.
+    # Колонки берутся из fieldnames или ключей первой строки: лишние ключи в других
+    # строках пропускаются (extrasaction='raise' - ошибка), недостающие пишутся пустыми.
+    # Пишем во временный файл рядом и подменяем им filename только после успешной
+    # записи: при ошибке посреди данных старый файл остается как был
+    rows = iter(data)
+    first = next(rows, None)
+    if fieldnames is None:
+        fieldnames = list(first.keys()) if first is not None else []
+    rows = chain([first], rows) if first is not None else rows
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', buffering=1024 * 1024,
+                                     dir=directory, prefix='.export_', suffix='.csv',
+                                     delete=False) as file:
+        try:
+            writer = csv.DictWriter(file, fieldnames, dialect=dialect, restval="",
+                                    extrasaction=extrasaction)
+            # Запись заголовков
+            if fieldnames:
+                writer.writeheader()
+
+            # Запись данных
+            if not workers:
+                for batch in _batches(rows, batch_size):
+                    writer.writerows(batch)
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    pending = deque()
+                    for batch in _batches(rows, batch_size):
+                        pending.append(pool.submit(_format_csv_batch, batch, fieldnames,
+                                                   dialect, extrasaction))
+                        if len(pending) >= 2 * workers:
+                            file.write(pending.popleft().result())
+                    while pending:
+                        file.write(pending.popleft().result())
+        except BaseException:
+            file.close()
+            os.remove(file.name)
+            raise
+    # mkstemp создает файл с правами 0600: берем права старого файла или обычные для нового
+    if os.path.exists(filename):
+        shutil.copymode(filename, file.name)
+    else:
+        os.chmod(file.name, 0o666 & ~UMASK)
+    os.replace(file.name, filename)
 
 # Данные для экспорта
 users = [
@@ -135,9 +308,15 @@ users = [
 ]
 
 # export_to_csv(users, "users.csv")
+# export_to_csv(({"id": i, "square": i * i} for i in range(10_000_000)), "squares.csv")
+# if __name__ == '__main__':
+#     export_to_csv(wide_rows(), "wide.csv", workers=4)
 
 # 5.3 Резервное копирование файла
-def backup_file(filename):
+def backup_file(filename, store=None):
+    # store=BackupStore(...) - инкрементальная копия (см. 5.3.1), возвращает id версии
+    if store is not None:
+        return store.backup(filename)
     import shutil
     import time
     backup_name = f"{filename}.bak_{time.strftime('%Y%m%d_%H%M%S')}"
@@ -151,6 +330,165 @@ with open('important_data.txt', 'w') as f:
 # Создаем резервную копию
 # backup = backup_file('important_data.txt')
 
+# 5.3.1 Инкрементальное хранилище резервных копий
+# backup_file() каждый раз делает полную копию. BackupStore режет файл на чанки
+# по содержимому (content-defined chunking) и хранит каждый уникальный чанк
+# один раз под его SHA-256. Граница зависит только от последних 16 байт перед
+# ней, поэтому правка в середине файла сдвигает только соседние границы,
+# остальные чанки переиспользуются.
+# Структура каталога:
+#   chunks/ab/abcd...   - чанки
+#   manifests/<sha>.json - версия файла: размер и список чанков
+#   index.json          - путь -> mtime, размер и история версий
+import hashlib
+import os
+import random
+import zlib
+
+# Поиск границ без цикла по байтам в Python (побайтовый rolling-хеш давал ~7 МБ/с):
+# 1) bytes.translate переводит блок в 0/1 по случайной половине значений байта;
+# 2) bytes.find ищет маркер 0...01 - кандидат встречается примерно раз в 2^длина байт;
+# 3) у кандидата проверяются остальные биты: crc32 последних 16 байт.
+# Шаги 1-2 идут на скорости C, в Python - только редкие кандидаты. Замер на 8-12 МБ:
+# поиск границ ~170 МБ/с, backup() целиком с SHA-256 и записью чанков ~100 МБ/с
+# (shutil.copy2 того же файла из кэша ОС - ~3 ГБ/с, зато без дедупликации)
+_boundary_random = random.Random(0x5EED)  # Фиксированное зерно: границы одинаковы между запусками
+_boundary_bytes = set(_boundary_random.sample(range(256), 128))
+BOUNDARY_TABLE = bytes(1 if value in _boundary_bytes else 0 for value in range(256))
+BOUNDARY_WINDOW = 16
+
+class BackupStore:
+    def __init__(self, root, min_chunk=16 * 1024, avg_chunk=64 * 1024, max_chunk=256 * 1024):
+        self.root = root
+        self.min_chunk = max(min_chunk, BOUNDARY_WINDOW)
+        self.max_chunk = max_chunk
+        # Граница в среднем раз в avg_chunk байт: bits случайных бит должны совпасть,
+        # до 8 из них дает маркер, остальные - маска crc32
+        bits = avg_chunk.bit_length() - 1
+        marker_len = max(1, min(bits, 8))
+        self.marker = b"\x00" * (marker_len - 1) + b"\x01"  # Вхождения не перекрываются
+        self.crc_mask = (1 << (bits - marker_len)) - 1
+        os.makedirs(os.path.join(root, "chunks"), exist_ok=True)
+        os.makedirs(os.path.join(root, "manifests"), exist_ok=True)
+        self.index_path = os.path.join(root, "index.json")
+        try:
+            with open(self.index_path, encoding='utf-8') as file:
+                self.index = json.load(file)
+        except FileNotFoundError:
+            self.index = {}
+
+    def _chunk_boundary(self, data, marks, start):
+        # Возвращает конец чанка, начинающегося с start; marks = data.translate(BOUNDARY_TABLE)
+        end = min(start + self.max_chunk, len(data))
+        marker, crc_mask = self.marker, self.crc_mask
+        position = start + self.min_chunk + 1 - len(marker)
+        while True:
+            position = marks.find(marker, position, end)
+            if position == -1:
+                return end
+            boundary = position + len(marker)
+            if not zlib.crc32(data[boundary - BOUNDARY_WINDOW:boundary]) & crc_mask:
+                return boundary
+            position += 1
+
+    def _iter_chunks(self, file):
+        # Читаем блоками; хвост без найденной границы переносится в следующий блок
+        pending = b""
+        while True:
+            block = file.read(4 * self.max_chunk)
+            data = pending + block
+            marks = data.translate(BOUNDARY_TABLE)
+            start = 0
+            while len(data) - start >= self.max_chunk or (not block and start < len(data)):
+                end = self._chunk_boundary(data, marks, start)
+                yield data[start:end]
+                start = end
+            pending = data[start:]
+            if not block:
+                return
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.root, "chunks", digest[:2], digest)
+
+    def _write_atomic(self, path, data):
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+    def backup(self, filename, save=True):
+        # Возвращает id версии (SHA-256 файла); неизмененный файл не перечитывается.
+        # save=False - не записывать index.json сейчас (см. backup_many/save)
+        key = os.path.abspath(filename)
+        stat = os.stat(filename)
+        entry = self.index.get(key)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["versions"][-1][1]
+
+        file_hash = hashlib.sha256()
+        chunks = []
+        with open(filename, 'rb') as file:
+            for chunk in self._iter_chunks(file):
+                digest = hashlib.sha256(chunk).hexdigest()
+                file_hash.update(chunk)
+                chunks.append(digest)
+                path = self._chunk_path(digest)
+                if not os.path.exists(path):  # Дедупликация
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    self._write_atomic(path, chunk)
+
+        version = file_hash.hexdigest()
+        manifest_path = os.path.join(self.root, "manifests", f"{version}.json")
+        if not os.path.exists(manifest_path):
+            manifest = {"size": stat.st_size, "chunks": chunks}
+            self._write_atomic(manifest_path, json.dumps(manifest).encode('utf-8'))
+
+        entry = entry or {"versions": []}
+        entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        if not entry["versions"] or entry["versions"][-1][1] != version:
+            entry["versions"].append([time.strftime('%Y%m%d_%H%M%S'), version])
+        self.index[key] = entry
+        if save:
+            self.save()
+        return version
+
+    def backup_many(self, filenames):
+        # {путь: id версии или исключение}. Индекс пишется один раз в конце,
+        # а не после каждого файла: иначе N файлов - это N перезаписей всего индекса
+        results = {}
+        try:
+            for filename in filenames:
+                try:
+                    results[filename] = self.backup(filename, save=False)
+                except OSError as e:
+                    results[filename] = e
+        finally:
+            self.save()  # Сохраняем и то, что успели, если обход прервался
+        return results
+
+    def save(self):
+        self._write_atomic(self.index_path, json.dumps(self.index).encode('utf-8'))
+
+    def versions(self, filename):
+        # [(время, id версии), ...] от старых к новым
+        entry = self.index.get(os.path.abspath(filename), {"versions": []})
+        return [tuple(version) for version in entry["versions"]]
+
+    def restore(self, version, destination):
+        # Склеивает чанки версии в файл destination
+        with open(os.path.join(self.root, "manifests", f"{version}.json"), encoding='utf-8') as file:
+            manifest = json.load(file)
+        with open(destination, 'wb', buffering=1024 * 1024) as out:
+            for digest in manifest["chunks"]:
+                with open(self._chunk_path(digest), 'rb') as chunk_file:
+                    out.write(chunk_file.read())
+        return destination
+
+# store = BackupStore("backups")
+# version = store.backup('important_data.txt')   # Повторный вызов без изменений - мгновенный
+# store.backup_many(glob.glob('data/**/*.csv', recursive=True))  # Индекс пишется один раз
+# store.restore(version, 'important_data.restored.txt')
+
 # 5.4 Генератор конфигурационных файлов
 def generate_config(settings, filename="config.ini"):
     with open(filename, 'w') as file:
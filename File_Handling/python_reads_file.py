@@ -99,15 +99,119 @@ except UnicodeDecodeError:
     print("Ошибка декодирования!")
 
 # 5.2 Автоматическое определение кодировки
-import chardet
+import codecs
+import os
+
+# Порядок важен: BOM UTF-32 LE начинается с BOM UTF-16 LE
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+from collections import OrderedDict
+
+ENCODING_SAMPLE_SIZE = 64 * 1024
+ENCODING_CACHE_SIZE = 10_000
+# LRU-кэш: путь -> (mtime, размер, кодировка). Ключ - только путь, поэтому
+# измененный файл перезаписывает свою запись, а не копит устаревшие
+_encoding_cache = OrderedDict()
+
+def _cached_encoding(path, stat):
+    # (кодировка,) из кэша или None; кортеж - потому что chardet может вернуть None
+    entry = _encoding_cache.get(path)
+    if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+        return None
+    _encoding_cache.move_to_end(path)
+    return entry[2:]
+
+def _cache_encoding(path, stat, encoding):
+    _encoding_cache[path] = (stat.st_mtime_ns, stat.st_size, encoding)
+    _encoding_cache.move_to_end(path)
+    if len(_encoding_cache) > ENCODING_CACHE_SIZE:
+        _encoding_cache.popitem(last=False)  # Вытесняем давно не использованный
+
+def _detect_encoding_uncached(file_path, sample_size=ENCODING_SAMPLE_SIZE):
+    with open(file_path, 'rb') as file:
+        sample = file.read(sample_size)
+
+        # Быстрый путь 1: BOM в начале файла
+        for bom, name in BOMS:
+            if sample.startswith(bom):
+                return name
+
+        # Быстрый путь 2: образец корректно декодируется как UTF-8
+        # (final=False - многобайтовый символ может быть обрезан концом образца)
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            pass
+
+        # Медленный путь: chardet, данные подаются порциями до уверенного ответа
+        from chardet.universaldetector import UniversalDetector
+        detector = UniversalDetector()
+        detector.feed(sample)
+        while not detector.done:
+            block = file.read(sample_size)
+            if not block:
+                break
+            detector.feed(block)
+        detector.close()
+        return detector.result['encoding']
 
 def detect_encoding(file_path):
-    with open(file_path, 'rb') as file:
-        raw_data = file.read(1000)
-        result = chardet.detect(raw_data)
-        return result['encoding']
+    # Результат кэшируется, пока не изменились mtime и размер файла
+    # (не больше ENCODING_CACHE_SIZE файлов)
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    cached = _cached_encoding(path, stat)
+    if cached is not None:
+        return cached[0]
+    encoding = _detect_encoding_uncached(path)
+    _cache_encoding(path, stat, encoding)
+    return encoding
 
 encoding = detect_encoding('unknown.txt')
+
+# 5.3 Массовое определение кодировок в нескольких процессах
+from concurrent.futures import ProcessPoolExecutor
+
+def _safe_detect_encoding(file_path):
+    try:
+        return _detect_encoding_uncached(file_path)
+    except Exception as e:
+        return e
+
+def detect_encodings(paths, workers=None, chunksize=64):
+    # Возвращает {путь: кодировка или исключение}; процессы обходят GIL для chardet
+    # Уже известные по кэшу файлы в пул не отправляются
+    # В скриптах вызывайте внутри if __name__ == '__main__':
+    paths = list(paths)
+    results, pending = {}, {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            results[path] = e
+            continue
+        cached = _cached_encoding(os.path.abspath(path), stat)
+        if cached is not None:
+            results[path] = cached[0]
+        else:
+            pending[path] = stat
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        detected = pool.map(_safe_detect_encoding, pending, chunksize=chunksize)
+        for (path, stat), result in zip(pending.items(), detected):
+            if not isinstance(result, Exception):
+                _cache_encoding(os.path.abspath(path), stat, result)
+            results[path] = result
+    return {path: results[path] for path in paths}
+
+# encodings = detect_encodings(['unknown.txt', 'russian.txt', 'data.txt'])
 with open('unknown.txt', 'r', encoding=encoding) as file:
     content = file.read()
 
@@ -116,49 +220,288 @@ with open('unknown.txt', 'r', encoding=encoding) as file:
 # =============================================
 
 # 6.1 Копирование файла
-def copy_file(source, destination):
+import errno
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+COPY_CHUNK_SIZE = 1024 * 1024  # 1 МБ
+
+# Ошибки, при которых ядро не умеет копировать эту пару файлов -> пробуем следующий способ
+KERNEL_COPY_ERRORS = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP}
+
+def _kernel_copy(src, dest, size, chunk_size, progress=None):
+    # Копирование внутри ядра: данные не проходят через память Python
+    # Возвращает количество скопированных байт (может быть < size, если способ не сработал)
+    copied = 0
+    for name in ('copy_file_range', 'sendfile'):
+        if not hasattr(os, name):
+            continue
+        try:
+            while copied < size:
+                count = min(chunk_size, size - copied)
+                if name == 'copy_file_range':
+                    sent = os.copy_file_range(src.fileno(), dest.fileno(), count, copied, copied)
+                else:
+                    dest.seek(copied)
+                    sent = os.sendfile(dest.fileno(), src.fileno(), copied, count)
+                if sent == 0:
+                    return copied  # Файл укоротился во время копирования
+                copied += sent
+                if progress:
+                    progress(copied, size)
+            return copied
+        except OSError as e:
+            if e.errno not in KERNEL_COPY_ERRORS:
+                raise
+    return copied
+
+def stream_copy(source, destination, chunk_size=COPY_CHUNK_SIZE, hash_name=None, progress=None):
+    # Потоковое копирование: память не зависит от размера файла
+    # hash_name='sha256' - считать хеш на лету (тогда копируем через буфер, ядро хеш не посчитает)
+    # progress(copied, total) - вызывается после каждого чанка
+    # Возвращает hexdigest (или None без хеширования), ошибки пробрасываются
+    digest = hashlib.new(hash_name) if hash_name else None
+    with open(source, 'rb') as src, open(destination, 'wb') as dest:
+        size = os.fstat(src.fileno()).st_size
+        copied = 0
+        if digest is None:
+            copied = _kernel_copy(src, dest, size, chunk_size, progress)
+        # Буферное копирование: с хешем, без поддержки ядра или для остатка файла
+        src.seek(copied)
+        dest.seek(copied)
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while True:
+            read = src.readinto(buffer)
+            if not read:
+                break
+            dest.write(view[:read])
+            if digest is not None:
+                digest.update(view[:read])
+            copied += read
+            if progress:
+                progress(copied, max(size, copied))
+    return digest.hexdigest() if digest is not None else None
+
+def copy_file(source, destination, **kwargs):
     try:
-        with open(source, 'rb') as src, open(destination, 'wb') as dest:
-            dest.write(src.read())
+        stream_copy(source, destination, **kwargs)
         return True
     except Exception as e:
         print(f"Ошибка копирования: {e}")
         return False
 
 # copy_file('source.txt', 'copy.txt')
+# stream_copy('big.iso', 'copy.iso', hash_name='sha256',
+#             progress=lambda done, total: print(f"\r{done * 100 // max(total, 1)}%", end=''))
+
+# 6.1.1 Параллельное копирование дерева каталогов
+def copy_tree(source_dir, destination_dir, workers=8, **kwargs):
+    # Каталоги создаются заранее, файлы копируются пулом потоков
+    # (ввод-вывод отпускает GIL). Возвращает {относительный путь: hexdigest или None}
+    jobs = []
+    for root, dirs, files in os.walk(source_dir):
+        target_root = os.path.join(destination_dir, os.path.relpath(root, source_dir))
+        os.makedirs(target_root, exist_ok=True)
+        for name in files:
+            jobs.append((os.path.join(root, name), os.path.join(target_root, name)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            os.path.relpath(src, source_dir): pool.submit(stream_copy, src, dst, **kwargs)
+            for src, dst in jobs
+        }
+        return {rel_path: future.result() for rel_path, future in futures.items()}
+
+# copy_tree('project', 'project_backup', hash_name='md5')
 
 # 6.2 Поиск и замена в файле
+import re
+import shutil
+import tempfile
+
+def _compile_replacements(replacements):
+    # {старое: новое} -> одно регулярное выражение (длинные строки первыми)
+    if '' in replacements:
+        raise ValueError("Заменяемая строка не может быть пустой")
+    olds = sorted(replacements, key=len, reverse=True)
+    pattern = re.compile("|".join(re.escape(old) for old in olds))
+    return pattern, lambda match: replacements[match.group(0)], max(map(len, olds))
+
+def stream_replace(file_path, replacements=None, pattern=None, repl=None,
+                   max_match_len=1024, chunk_size=COPY_CHUNK_SIZE, encoding='utf-8'):
+    # Потоковая замена за один проход:
+    #   replacements={'старое': 'новое', ...} - несколько строк сразу
+    #   pattern=r'\d+', repl='N' - регулярное выражение (совпадение вместе с
+    #   просмотром вперед/назад не длиннее max_match_len)
+    # Результат пишется во временный файл рядом и атомарно подменяет исходный (os.replace),
+    # поэтому сбой посреди записи не портит файл. Возвращает число замен
+    if replacements:
+        pattern, repl, max_match_len = _compile_replacements(replacements)
+    elif isinstance(pattern, str):
+        pattern = re.compile(pattern)
+    if pattern is None:
+        raise ValueError("Нужно передать replacements или pattern")
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    count = 0
+    with open(file_path, 'r', encoding=encoding, newline='') as src, \
+            tempfile.NamedTemporaryFile('w', encoding=encoding, newline='', dir=directory,
+                                        prefix='.replace_', delete=False) as tmp:
+        try:
+            context = carry = ''
+            empty_done = False  # Пустое совпадение в начале буфера уже обработано
+            while True:
+                chunk = src.read(chunk_size)
+                # Перед необработанным текстом идет до max_match_len уже записанных
+                # символов (context): поиск начинается после них, но ^, \b и
+                # просмотр назад видят левый контекст, как re.sub по всему файлу
+                buffer = context + carry + chunk
+                start = len(context)
+                # Совпадения, заканчивающиеся в последних max_match_len символах,
+                # могут продолжаться в следующем чанке - откладываем их. Граница
+                # строгая: пустое совпадение ровно на cut найдется в следующем буфере
+                cut = len(buffer) - max_match_len if chunk else len(buffer) + 1
+                position = start
+                safe = max(cut, start)
+                last_empty = empty_done
+                for match in pattern.finditer(buffer, start):
+                    if last_empty and match.end() == start:
+                        continue  # Это пустое совпадение уже заменено в прошлом буфере
+                    if match.end() >= cut:
+                        safe = min(safe, match.start())
+                        break
+                    tmp.write(buffer[position:match.start()])
+                    tmp.write(match.expand(repl) if isinstance(repl, str) else repl(match))
+                    position = match.end()
+                    last_empty = match.start() == position
+                    count += 1
+                if not chunk:
+                    tmp.write(buffer[position:])
+                    break
+                safe = max(position, safe)
+                empty_done = last_empty and position == safe
+                tmp.write(buffer[position:safe])
+                context, carry = buffer[max(safe - max_match_len, 0):safe], buffer[safe:]
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        except BaseException:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+    shutil.copymode(file_path, tmp.name)
+    os.replace(tmp.name, file_path)
+    return count
+
 def replace_in_file(file_path, old_str, new_str):
     try:
-        with open(file_path, 'r+') as file:
-            content = file.read()
-            new_content = content.replace(old_str, new_str)
-            file.seek(0)
-            file.write(new_content)
-            file.truncate() # Обрезать остаток файла
+        stream_replace(file_path, {old_str: new_str})
         return True
     except Exception as e:
         print(f"Ошибка: {e}")
         return False
 
 # replace_in_file('text.txt', 'старое', 'новое')
+# stream_replace('big.log', {'ERROR': 'E', 'WARNING': 'W'})
+# stream_replace('big.log', pattern=r'\d{4}-\d{2}-\d{2}', repl='<date>', max_match_len=10)
+
+# 6.2.1 Замена сразу в нескольких файлах
+def replace_in_files(paths, workers=8, **kwargs):
+    # Возвращает {путь: число замен или исключение}
+    def run(path):
+        try:
+            return stream_replace(path, **kwargs)
+        except Exception as e:
+            return e
+
+    paths = list(paths)  # Генератор иначе израсходует pool.map, и zip получит пустоту
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(run, paths)))
+
+# replace_in_files(['a.txt', 'b.txt'], replacements={'foo': 'bar'})
 
 # 6.3 Чтение больших файлов по частям
-def process_large_file(file_path, chunk_size=1024):
+import mmap
+import sys
+
+def iter_mmap_chunks(file_path, chunk_size=1024 * 1024):
+    # Файл отображается в память (mmap), наружу отдаются срезы memoryview -
+    # без копирования байтов и без декодирования.
+    # Срез действителен только до следующего шага итерации: потом он освобождается,
+    # иначе mmap нельзя будет закрыть (BufferError)
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return  # Пустой файл нельзя отобразить в память
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                for start in range(0, len(view), chunk_size):
+                    with view[start:start + chunk_size] as chunk:
+                        yield chunk
+
+def process_large_file(file_path, chunk_size=1024, callback=None, use_mmap=False):
+    # callback(chunk) вызывается для каждого чанка вместо print()
+    # use_mmap=True - чанки приходят как memoryview (байты), без копирования
     try:
+        if use_mmap:
+            if callback is None:
+                callback = sys.stdout.buffer.write
+            for chunk in iter_mmap_chunks(file_path, chunk_size):
+                callback(chunk)
+            return True
+        if callback is None:
+            callback = lambda chunk: print(chunk, end='')
         with open(file_path, 'r') as file:
             while True:
                 chunk = file.read(chunk_size)
                 if not chunk:
                     break
                 # Обработка чанка данных
-                print(chunk, end='')
+                callback(chunk)
         return True
     except Exception as e:
         print(f"Ошибка: {e}")
         return False
 
 # process_large_file('big_file.txt')
+# process_large_file('big_file.log', chunk_size=4 * 1024 * 1024, callback=handle, use_mmap=True)
+
+# 6.3.1 Сравнение скорости: чанки по 1 КБ против mmap
+def benchmark_process_large_file(sizes_mb=(1, 16, 128), mmap_chunk_size=4 * 1024 * 1024):
+    import tempfile
+    import time
+
+    # Оба режима делают одинаковую работу над каждым байтом: иначе mmap ничего
+    # не прочитает (страницы подгружаются с диска только при обращении).
+    # У memoryview нет count(), поэтому срез копируется в bytes (это memcpy)
+    def count_lines(chunk):
+        nonlocal lines
+        lines += chunk.count("\n") if isinstance(chunk, str) else bytes(chunk).count(b"\n")
+
+    line = b"2024-01-01 12:00:00 INFO Some log message here\n"
+    for size_mb in sizes_mb:
+        with tempfile.NamedTemporaryFile('wb', suffix='.log', delete=False) as tmp:
+            block = line * (1024 * 1024 // len(line) + 1)
+            for _ in range(size_mb):
+                tmp.write(block[:1024 * 1024])
+            path = tmp.name
+        try:
+            lines = 0
+            start = time.perf_counter()
+            process_large_file(path, 1024, callback=count_lines)
+            chunked = time.perf_counter() - start
+            chunked_lines, lines = lines, 0
+
+            start = time.perf_counter()
+            process_large_file(path, mmap_chunk_size, callback=count_lines, use_mmap=True)
+            mapped = time.perf_counter() - start
+            assert lines == chunked_lines
+
+            print(f"{size_mb:>5} МБ: чанки 1 КБ {chunked:.3f} с, "
+                  f"mmap {mapped:.3f} с (x{chunked / max(mapped, 1e-9):.1f})")
+        finally:
+            os.remove(path)
+
+# benchmark_process_large_file()
 
 # 6.4 Работа с CSV файлами
 import csv
@@ -170,6 +513,139 @@ def read_csv_file(file_path):
 
 # read_csv_file('data.csv')
 
+# 6.4.1 Типизированное колоночное чтение CSV
+# Вместо списков строк по одной - сразу колонки array.array ('q' - int64, 'd' - float64)
+# или списки str; типы выводятся по первым sample_size строкам
+from array import array
+from operator import itemgetter
+
+CSV_BATCH_SIZE = 65536
+
+# Цепочка повышения типа, если значение не подошло: int -> float -> str
+TYPE_PROMOTION = {'q': 'd', 'd': 'str'}
+
+def _infer_kind(values):
+    kind = 'q'
+    for value in values:
+        if not value:
+            kind = 'd' if kind == 'q' else kind  # Пропуск -> NaN, нужен float
+            continue
+        try:
+            if kind == 'q':
+                int(value)
+            else:
+                float(value)
+        except ValueError:
+            if kind == 'd':
+                return 'str'
+            kind = 'd'
+            try:
+                float(value)
+            except ValueError:
+                return 'str'
+    return kind
+
+def _convert_column(values, kind):
+    # Возвращает (колонка, фактический тип) - тип повышается, если данные не подошли
+    while True:
+        try:
+            if kind == 'q':
+                return array('q', map(int, values)), kind
+            if kind == 'd':
+                return array('d', [float(v) if v else float('nan') for v in values]), kind
+            return list(values), kind
+        except (ValueError, OverflowError):
+            kind = TYPE_PROMOTION[kind]
+
+KIND_ORDER = ['q', 'd', 'str']
+
+def _column_kind(column):
+    return column.typecode if isinstance(column, array) else 'str'
+
+def _promote_column(column, kind):
+    if kind == 'd':
+        return array('d', column)
+    return [str(v) for v in column]
+
+def _read_rows(csv_reader, count, width):
+    # Следующие count непустых строк; пустые строки файла пропускаются,
+    # короткие дополняются '' (пропуск) до нужной ширины - до вывода типов
+    rows = []
+    for row in csv_reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row.extend([''] * (width - len(row)))
+        rows.append(row)
+        if len(rows) == count:
+            break
+    return rows
+
+def iter_csv_batches(file_path, columns=None, sample_size=1000,
+                     batch_size=CSV_BATCH_SIZE, encoding='utf-8'):
+    # Потоковый режим: по batch_size строк за раз, память ограничена размером пачки
+    # columns - имена или номера нужных колонок (проекция), None - все
+    # Отдает словари {имя колонки: array/list}
+    with open(file_path, 'r', newline='', encoding=encoding) as file:
+        csv_reader = csv.reader(file)
+        header = next(csv_reader, None)
+        if header is None:
+            return
+        if columns is None:
+            columns = header
+        indexes = [c if isinstance(c, int) else header.index(c) for c in columns]
+        if not indexes:
+            raise ValueError("Пустой список колонок: нужна хотя бы одна")
+        names = [header[i] for i in indexes]
+        width = max(indexes) + 1
+        pick = itemgetter(*indexes) if len(indexes) > 1 else (lambda row: (row[indexes[0]],))
+
+        batch = _read_rows(csv_reader, max(sample_size, batch_size), width)
+        if not batch:
+            # Только заголовок: одна пачка пустых колонок (тип не из чего вывести - str)
+            yield {name: [] for name in names}
+            return
+        kinds = [_infer_kind(values) for values in zip(*map(pick, batch[:sample_size]))]
+        while batch:
+            result = {}
+            for i, (name, values) in enumerate(zip(names, zip(*map(pick, batch)))):
+                result[name], kinds[i] = _convert_column(values, kinds[i])
+            yield result
+            batch = _read_rows(csv_reader, batch_size, width)
+
+def read_csv_columns(file_path, columns=None, use_numpy=False, **kwargs):
+    # Читает файл целиком в колонки; use_numpy=True - вернуть массивы NumPy
+    # (числовые колонки оборачиваются без копирования через np.frombuffer)
+    result = {}
+    for batch in iter_csv_batches(file_path, columns, **kwargs):
+        for name, values in batch.items():
+            current = result.get(name)
+            if current is None:
+                result[name] = values
+                continue
+            # Тип колонки мог повыситься в очередной пачке - приводим к более общему
+            kind = max(_column_kind(current), _column_kind(values), key=KIND_ORDER.index)
+            if _column_kind(current) != kind:
+                current = result[name] = _promote_column(current, kind)
+            current.extend(values if _column_kind(values) == kind else _promote_column(values, kind))
+    if use_numpy:
+        import numpy as np
+        dtypes = {'q': np.int64, 'd': np.float64}
+        result = {
+            name: np.frombuffer(values, dtype=dtypes[values.typecode]) if isinstance(values, array)
+            else np.array(values, dtype=object)
+            for name, values in result.items()
+        }
+    return result
+
+# columns = read_csv_columns('data.csv')
+# Файл 'a,b\n1\n\n3,4\n': пустая строка пропускается, короткая дополняется пропуском
+# read_csv_columns('ragged.csv')  # {'a': array('q', [1, 3]), 'b': array('d', [nan, 4.0])}
+# read_csv_columns('header_only.csv')  # {'a': [], 'b': []}
+# columns = read_csv_columns('sales.csv', columns=['price', 'quantity'], use_numpy=True)
+# for batch in iter_csv_batches('huge.csv', columns=['amount']):
+#     total += sum(batch['amount'])
+
 """
 КЛЮЧЕВЫЕ ТЕЗИСЫ:
 1. Функция open():
@@ -94,17 +94,194 @@ def factorial(n):
 
 print(factorial(5))  # 120
 
+# 5.1.1 Быстрый факториал и биномиальные коэффициенты
+# factorial() выше падает с RecursionError уже при n около 1000 и умножает
+# огромное число на маленькое n раз. Деление пополам (binary splitting)
+# перемножает числа похожей длины - так работает быстрое умножение больших int,
+# а глубина рекурсии всего log2(n)
+import math
+from collections import OrderedDict
+from numbers import Real
+
+def _range_product(lo, hi):
+    # Произведение (lo+1) * (lo+2) * ... * hi деревом умножений
+    if hi - lo <= 32:
+        result = 1
+        for k in range(lo + 1, hi + 1):
+            result *= k
+        return result
+    mid = (lo + hi) // 2
+    return _range_product(lo, mid) * _range_product(mid, hi)
+
+_factorial_cache = OrderedDict()  # n -> n!, опорные точки для повторных запросов
+FACTORIAL_CACHE_SIZE = 64
+
+def fast_factorial(n):
+    if n < 0:
+        raise ValueError("n должно быть неотрицательным")
+    if n in _factorial_cache:
+        _factorial_cache.move_to_end(n)
+        return _factorial_cache[n]
+    # Ближайшая меньшая опорная точка: n! = k! * (k+1) * ... * n
+    base = max((k for k in _factorial_cache if k < n), default=0)
+    result = _factorial_cache.get(base, 1) * _range_product(base, n)
+    _factorial_cache[n] = result
+    if len(_factorial_cache) > FACTORIAL_CACHE_SIZE:
+        _factorial_cache.popitem(last=False)  # Вытесняем давно не использованный
+    return result
+
+def binomial(n, k):
+    # C(n, k) = (n-k+1) * ... * n / k! - без вычисления n! целиком
+    if k < 0 or k > n:
+        return 0
+    k = min(k, n - k)
+    return _range_product(n - k, n) // fast_factorial(k)
+
+def log_factorial(values):
+    # ln(n!) = ln Г(n+1) для неотрицательного числа (int или float), списка или
+    # массива NumPy. Для массива - векторно: целые n <= 256 берутся из таблицы
+    # накопленных сумм ln(k), большие n - по ряду Стирлинга
+    if not hasattr(values, "dtype"):
+        if isinstance(values, Real):
+            if values < 0:
+                raise ValueError("n должно быть неотрицательным")
+            return math.lgamma(values + 1)
+        if isinstance(values, (list, tuple)):
+            return [log_factorial(n) for n in values]
+        raise TypeError(f"Ожидалось число, список или массив, а не {type(values).__name__}")
+
+    import numpy as np
+    n = np.asarray(values, dtype=np.float64)
+    if (n < 0).any():
+        raise ValueError("n должно быть неотрицательным")
+    table = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, 257)))))
+    result = np.empty_like(n)
+    small = n <= 256
+    whole = small & (n == np.floor(n))
+    result[whole] = table[n[whole].astype(np.int64)]
+    # Малые дробные, inf и nan - редкий случай, их считает math.lgamma поэлементно
+    rare = (small & ~whole) | ~np.isfinite(n)
+    result[rare] = [math.lgamma(x + 1) for x in n[rare]]
+    stirling = ~(small | rare)
+    big = n[stirling]
+    result[stirling] = (big * np.log(big) - big + 0.5 * np.log(2 * np.pi * big)
+                        + 1 / (12 * big) - 1 / (360 * big ** 3))
+    return result
+
+print(fast_factorial(25))     # 15511210043330985984000000
+print(binomial(50, 3))        # 19600
+print(log_factorial(10))      # 15.104412573075514
+print(log_factorial(2.5))     # 1.2009736023470738
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+if np is not None:
+    print(log_factorial(np.array([0, 5, 100, 10**6])))  # [0.00000000e+00 4.78749174e+00 3.63739376e+02 1.28155184e+07]
+
+# 5.1.2 Сравнение скорости с math.factorial и factorial()
+def benchmark_factorial(sizes=(500, 10_000, 100_000)):
+    import time
+
+    for n in sizes:
+        timings = {}
+        for name, func in (("factorial()", factorial), ("math.factorial", math.factorial),
+                           ("fast_factorial", fast_factorial)):
+            _factorial_cache.clear()
+            start = time.perf_counter()
+            try:
+                func(n)
+                timings[name] = f"{time.perf_counter() - start:.4f} с"
+            except RecursionError:
+                timings[name] = "RecursionError"
+        start = time.perf_counter()
+        fast_factorial(n + 10)  # Повторный запрос рядом с опорной точкой
+        timings["повтор из кэша"] = f"{time.perf_counter() - start:.4f} с"
+        print(f"n = {n}: " + ", ".join(f"{name}: {value}" for name, value in timings.items()))
+
+# benchmark_factorial()
+
 # 5.2 Обработка вложенных структур
+# Рекурсивный вариант копирует элементы в промежуточный список на каждом уровне
+# и падает с RecursionError на глубокой вложенности. Здесь обход идет с явным
+# стеком итераторов, поэтому глубина не ограничена стеком вызовов. Вложенный
+# контейнер из одних скаляров отдается целиком, без поэлементной проверки
+from itertools import repeat
+
+def _is_flat(item, containers):
+    # Итератор (генератор, файл) проверять нельзя - проверка его израсходует
+    return iter(item) is not item and not any(map(isinstance, item, repeat(containers)))
+
+def iter_flatten(data, containers=(list, tuple), max_depth=None):
+    # Ленивый генератор: элементы отдаются по одному, data может быть бесконечным.
+    # containers - какие типы раскрывать; max_depth - сколько уровней раскрыть
+    # (глубже контейнеры отдаются как есть), None - без ограничения
+    stack = [iter(data)]
+    while stack:
+        for item in stack[-1]:
+            if isinstance(item, containers) and (max_depth is None or len(stack) <= max_depth):
+                if _is_flat(item, containers):
+                    yield from item  # Быстрый путь: внутри только скаляры
+                    continue
+                stack.append(iter(item))
+                break
+            yield item
+        else:
+            stack.pop()
+
 def flatten(lst):
+    # Список строится сразу, поэтому скаляры копятся в пачки и добавляются через extend
     result = []
-    for item in lst:
-        if isinstance(item, list):
-            result.extend(flatten(item))
-        else:
+    stack = [iter(lst)]
+    while stack:
+        for item in stack[-1]:
+            if isinstance(item, list):
+                if _is_flat(item, list):
+                    result.extend(item)
+                    continue
+                stack.append(iter(item))
+                break
             result.append(item)
+        else:
+            stack.pop()
     return result
 
 print(flatten([1, [2, [3, 4], 5]]))  # [1, 2, 3, 4, 5]
+print(list(iter_flatten([1, (2, [3, [4]])], max_depth=2)))  # [1, 2, 3, [4]]
+# from itertools import count
+# next(iter_flatten(count()))  # 0 - бесконечный поток не читается заранее
+
+# 5.2.1 Сравнение с рекурсивным вариантом: миллион элементов, тысяча уровней
+def benchmark_flatten(width=1000, depth=1000):
+    import time
+
+    def recursive(lst):
+        result = []
+        for item in lst:
+            if isinstance(item, list):
+                result.extend(recursive(item))
+            else:
+                result.append(item)
+        return result
+
+    wide = [list(range(width)) for _ in range(depth)]
+    deep = list(range(width))
+    for _ in range(depth - 1):
+        deep = [*range(width), deep]
+
+    for label, data in (("широкая", wide), ("глубокая", deep)):
+        timings = {}
+        for name, func in (("рекурсия", recursive), ("явный стек", flatten)):
+            start = time.perf_counter()
+            try:
+                count = len(func(data))
+                timings[name] = f"{time.perf_counter() - start:.4f} с ({count} эл.)"
+            except RecursionError:
+                timings[name] = "RecursionError"
+        print(f"{label}: " + ", ".join(f"{name}: {value}" for name, value in timings.items()))
+
+# benchmark_flatten()
 
 # 5.3 Кэширование результатов (мемоизация)
 from functools import lru_cache
@@ -117,6 +294,68 @@ def fibonacci(n):
 
 print(fibonacci(10))  # 55
 
+# 5.3.1 Быстрые числа Фибоначчи
+# fibonacci() выше хранит в кэше все значения без ограничения и на больших n
+# падает с RecursionError. Метод быстрого удвоения (fast doubling) считает F(n)
+# за O(log n) шагов без рекурсии, по битам n:
+#   F(2k)   = F(k) * (2*F(k+1) - F(k))
+#   F(2k+1) = F(k)^2 + F(k+1)^2
+def fibonacci_pair(n):
+    # Возвращает (F(n), F(n+1))
+    if n < 0:
+        raise ValueError("n должно быть неотрицательным")
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        c = a * (2 * b - a)  # F(2k)
+        d = a * a + b * b    # F(2k+1)
+        a, b = (d, c + d) if bit == "1" else (c, d)
+    return a, b
+
+# Ограниченный кэш: хранит 1024 последних результата, статистика - fast_fibonacci.cache_info()
+@lru_cache(maxsize=1024)
+def fast_fibonacci(n):
+    return fibonacci_pair(n)[0]
+
+def fibonacci_range(start, stop):
+    # Генератор F(start), ..., F(stop - 1): стартовая пара - удвоением, дальше сложение
+    a, b = fibonacci_pair(start)
+    for _ in range(start, stop):
+        yield a
+        a, b = b, a + b
+
+print(fast_fibonacci(100))              # 354224848179261915075
+print(list(fibonacci_range(10, 15)))    # [55, 89, 144, 233, 377]
+print(fast_fibonacci.cache_info())      # CacheInfo(hits=0, misses=1, maxsize=1024, currsize=1)
+
+# 5.3.2 Сравнение скорости при n = 10^3 ... 10^6
+def benchmark_fibonacci(powers=(3, 4, 5, 6)):
+    import time
+
+    def linear(n):
+        a, b = 0, 1
+        for _ in range(n):
+            a, b = b, a + b
+        return a
+
+    for power in powers:
+        n = 10 ** power
+        timings = {}
+        for name, func in (("рекурсия+lru_cache", fibonacci), ("линейный", linear),
+                           ("удвоение", lambda n: fibonacci_pair(n)[0])):
+            if name == "линейный" and power > 5:
+                timings[name] = "пропуск (слишком долго)"
+                continue
+            fibonacci.cache_clear()
+            start = time.perf_counter()
+            try:
+                func(n)
+                timings[name] = f"{time.perf_counter() - start:.4f} с"
+            except RecursionError:
+                timings[name] = "RecursionError"
+        print(f"n = 10^{power}: " + ", ".join(f"{name}: {value}" for name, value in timings.items()))
+
+# benchmark_fibonacci()
+
 """
 КЛЮЧЕВЫЕ ТЕЗИСЫ:
 1. Функции определяются через def, принимают параметры и возвращают значения через return
@@ -129,7 +368,8 @@ print(fibonacci(10))  # 55
 4. Область видимости:
    - Локальные переменные существуют только внутри функции
    - global/nonlocal для доступа к внешним переменным
-5. Рекурсия требует базового случая и рекурсивного вызова
+5. Рекурсия требует базового случая и рекурсивного вызова; глубина ограничена
+   sys.getrecursionlimit() - для больших данных нужен явный стек или итерация
 6. Декораторы (@lru_cache) расширяют функциональность
 7. Best practices:
    - Используйте docstrings для документации
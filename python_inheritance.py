@@ -132,10 +132,72 @@ manager = Manager("Иван", 150000, "IT")
 print(manager.get_info())  # Иван: 150000, отдел: IT
 
 # 6.2 Миксины (Mixin-классы)
+import json
+from operator import attrgetter
+
 class JSONSerializableMixin:
+    # Пустые __slots__ у миксина, иначе он добавит __dict__ классам со __slots__
+    __slots__ = ()
+    _json_encode = json.JSONEncoder().encode
+
+    @classmethod
+    def _json_plan(cls):
+        # План полей считается один раз на класс: слоты по всему MRO + есть ли __dict__
+        plan = cls.__dict__.get("_json_plan_cache")
+        if plan is None:
+            fields, has_dict = [], False
+            for klass in reversed(cls.__mro__[:-1]):  # Без object
+                if "__slots__" not in klass.__dict__:
+                    has_dict = True  # Класс без __slots__ дает экземплярам __dict__
+                    continue
+                slots = klass.__dict__["__slots__"]
+                for name in [slots] if isinstance(slots, str) else slots:
+                    if name == "__dict__":
+                        has_dict = True
+                    elif name != "__weakref__" and name not in fields:
+                        fields.append(name)
+            plan = (tuple(fields), attrgetter(*fields) if fields else None, has_dict)
+            setattr(cls, "_json_plan_cache", plan)
+        return plan
+
+    def to_dict(self) -> dict:
+        fields, getter, has_dict = self._json_plan()
+        if getter is None:
+            data = {}
+        else:
+            try:
+                values = getter(self)
+                data = dict(zip(fields, values if len(fields) > 1 else (values,)))
+            except AttributeError:  # Какой-то слот не заполнен - пропускаем его
+                data = {name: getattr(self, name) for name in fields if hasattr(self, name)}
+        if has_dict:
+            data.update(self.__dict__)
+        return data
+
     def to_json(self) -> str:
-        import json
-        return json.dumps(self.__dict__)
+        return self._json_encode(self.to_dict())
+
+    @classmethod
+    def to_json_many(cls, objects) -> str:
+        # JSON-массив из любого итерируемого объекта
+        encode = cls._json_encode
+        return "[" + ", ".join(encode(obj.to_dict()) for obj in objects) + "]"
+
+    @classmethod
+    def to_jsonl(cls, objects, file, batch_size: int = 10_000) -> int:
+        # Потоковая запись по строке на объект, пачками; возвращает число объектов
+        encode = cls._json_encode
+        count, batch = 0, []
+        for obj in objects:
+            batch.append(encode(obj.to_dict()))
+            if len(batch) >= batch_size:
+                file.write("\n".join(batch) + "\n")
+                count += len(batch)
+                batch.clear()
+        if batch:
+            file.write("\n".join(batch) + "\n")
+            count += len(batch)
+        return count
 
 class Product(JSONSerializableMixin):
     def __init__(self, id: int, name: str):
@@ -145,6 +207,22 @@ class Product(JSONSerializableMixin):
 product = Product(1, "Ноутбук")
 print(product.to_json())  # {"id": 1, "name": "Ноутбук"}
 
+# Компактный товар: __slots__ вместо __dict__ - меньше памяти на экземпляр
+class CompactProduct(JSONSerializableMixin):
+    __slots__ = ("id", "name", "price")
+
+    def __init__(self, id: int, name: str, price: float):
+        self.id = id
+        self.name = name
+        self.price = price
+
+compact = CompactProduct(2, "Мышь", 990.0)
+print(compact.to_json())  # {"id": 2, "name": "Мышь", "price": 990.0}
+print(CompactProduct.to_json_many([compact, CompactProduct(3, "Коврик", 300.0)]))
+
+# with open("products.jsonl", "w", encoding="utf-8") as file:
+#     CompactProduct.to_jsonl((CompactProduct(i, f"Товар {i}", i * 10.0) for i in range(1_000_000)), file)
+
 """
 КЛЮЧЕВЫЕ ТЕЗИСЫ:
 1. Наследование позволяет повторно использовать код и создавать иерархии
@@ -53,6 +53,7 @@ def fibonacci(limit: int):
 # Использование
 fib = fibonacci(10)
 print(list(fib))  # [0, 1, 1, 2, 3, 5, 8]
+# Генератор с произвольного номера (старт за O(log n)) - fibonacci_range() в functions_python.py
 
 # 3.2 Генераторное выражение
 squares = (x**2 for x in range(5))
@@ -95,6 +96,147 @@ class FileReader:
 # for line in FileReader("data.txt"):
 #     print(line)
 
+# 5.1.1 Буферизированное чтение с упреждением
+# FileReader вызывает readline() на каждую строку и закрывает файл, только
+# дойдя до конца: брошенный на полпути итератор оставляет файл открытым.
+# BufferedFileReader читает блоки по block_size байт и сам режет их на строки,
+# закрывается через with/close(), помнит смещение в байтах (offset) для
+# продолжения чтения и умеет отдавать строки пачками по batch_size
+class BufferedFileReader:
+    def __init__(self, filename: str, block_size: int = 1024 * 1024, encoding: str = "utf-8",
+                 batch_size: int | None = None, offset: int = 0):
+        self.file = open(filename, "rb")
+        self.file.seek(offset)
+        self.block_size = block_size
+        self.encoding = encoding
+        self.batch_size = batch_size
+        self._block_offset = offset  # Смещение в файле начала текущего блока
+        self._raw = b""              # Байты текущего блока (целые строки)
+        self._lines = []             # Его строки, уже декодированные и очищенные
+        self._pos = 0
+        self._tail = b""
+
+    @property
+    def offset(self) -> int:
+        # Смещение начала следующей непрочитанной строки; считается только по запросу,
+        # чтобы не тратить время на каждую строку
+        end = -1
+        for _ in range(self._pos):
+            end = self._raw.find(b"\n", end + 1)
+            if end == -1:
+                return self._block_offset + len(self._raw)  # Последняя строка без \n
+        return self._block_offset + end + 1
+
+    def __iter__(self):
+        # Цикл for идет через генератор - это быстрее, чем вызов __next__ на каждую строку
+        return self._iter_batches() if self.batch_size else self._iter_lines()
+
+    def _iter_lines(self):
+        while self._fill():
+            lines = self._lines
+            for pos in range(self._pos, len(lines)):
+                self._pos = pos + 1
+                yield lines[pos]
+
+    def _iter_batches(self):
+        while True:
+            batch = next(self, None)
+            if not batch:
+                return
+            yield batch
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def _fill(self) -> bool:
+        # Читает блоки, пока не найдется хотя бы одна целая строка
+        while self._pos >= len(self._lines):
+            if self.file.closed:
+                return False
+            self._block_offset += len(self._raw)
+            block = self.file.read(self.block_size)
+            if block:
+                data = self._tail + block
+                cut = data.rfind(b"\n") + 1
+                self._raw, self._tail = data[:cut], data[cut:]  # Хвост - начало следующей строки
+                text = self._raw[:-1]
+            else:
+                self.close()
+                self._raw, self._tail = self._tail, b""
+                text = self._raw
+            # Блок декодируется целиком: разрез по \n не может разорвать символ UTF-8
+            self._lines = [line.strip() for line in text.decode(self.encoding).split("\n")] if self._raw else []
+            self._pos = 0
+        return True
+
+    def __next__(self):
+        pos = self._pos
+        if pos >= len(self._lines):
+            if not self._fill():
+                raise StopIteration
+            pos = 0
+        if self.batch_size is None:
+            self._pos = pos + 1
+            return self._lines[pos]
+
+        batch = self._lines[pos:pos + self.batch_size]
+        self._pos = pos + len(batch)
+        while len(batch) < self.batch_size and self._fill():
+            rest = self._lines[:self.batch_size - len(batch)]
+            self._pos = len(rest)
+            batch.extend(rest)
+        return batch
+
+# with BufferedFileReader("data.txt") as reader:
+#     for line in reader:
+#         if line == "STOP":
+#             saved_offset = reader.offset  # Файл закроется при выходе из with
+#             break
+# with BufferedFileReader("data.txt", offset=saved_offset, batch_size=1000) as reader:
+#     for lines in reader:
+#         print(len(lines))
+
+# 5.1.2 Сравнение скорости с FileReader
+def benchmark_file_readers(lines: int = 1_000_000):
+    import os
+    import tempfile
+    import time
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as tmp:
+        tmp.writelines(f"Строка номер {i}\n" for i in range(lines))
+        path = tmp.name
+    try:
+        start = time.perf_counter()
+        for line in FileReader(path):
+            pass
+        plain = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with BufferedFileReader(path) as reader:
+            for line in reader:
+                pass
+        buffered = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with BufferedFileReader(path, batch_size=1000) as reader:
+            for batch in reader:
+                pass
+        batched = time.perf_counter() - start
+    finally:
+        os.remove(path)
+
+    print(f"FileReader:                          {plain:.2f} с")
+    print(f"BufferedFileReader:                  {buffered:.2f} с (x{plain / buffered:.1f})")
+    print(f"BufferedFileReader(batch_size=1000): {batched:.2f} с (x{plain / batched:.1f})")
+
+# benchmark_file_readers()
+
 # 5.2 Бесконечный итератор
 class InfiniteCounter:
     def __init__(self):
@@ -111,6 +253,124 @@ class InfiniteCounter:
 # print(next(counter))  # 1
 # print(next(counter))  # 2...
 
+# 5.3 Ленивый конвейер (pipeline) из итераторов
+# Каждая стадия - обертка над итератором, ничего не вычисляется до перебора,
+# поэтому даже бесконечный InfiniteCounter или огромный файл проходят
+# через несколько стадий с постоянной памятью
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+class Pipeline:
+    def __init__(self, source):
+        self._source = source
+
+    def __iter__(self):
+        return iter(self._source)
+
+    def map(self, func) -> "Pipeline":
+        return Pipeline(map(func, self._source))
+
+    def filter(self, predicate) -> "Pipeline":
+        return Pipeline(filter(predicate, self._source))
+
+    def take(self, count: int) -> "Pipeline":
+        return Pipeline(islice(self._source, count))
+
+    def batch(self, size: int) -> "Pipeline":
+        # [1, 2, 3, 4, 5] -> [1, 2], [3, 4], [5]
+        def batches(iterator):
+            while batch := list(islice(iterator, size)):
+                yield batch
+        return Pipeline(batches(iter(self._source)))
+
+    def window(self, size: int) -> "Pipeline":
+        # Скользящее окно: [1, 2, 3, 4] -> (1, 2, 3), (2, 3, 4)
+        def windows(iterator):
+            current = deque(islice(iterator, size - 1), maxlen=size)
+            for item in iterator:
+                current.append(item)
+                yield tuple(current)
+        return Pipeline(windows(iter(self._source)))
+
+    def dedupe(self, key=None, max_seen: int | None = None) -> "Pipeline":
+        # Пропускает повторы; max_seen ограничивает память (помним последние ключи)
+        def unique(iterator):
+            seen = OrderedDict() if max_seen else set()
+            for item in iterator:
+                marker = key(item) if key else item
+                if marker in seen:
+                    if max_seen:
+                        seen.move_to_end(marker)
+                    continue
+                if max_seen:
+                    seen[marker] = None
+                    if len(seen) > max_seen:
+                        seen.popitem(last=False)
+                else:
+                    seen.add(marker)
+                yield item
+        return Pipeline(unique(iter(self._source)))
+
+    def parallel_map(self, func, workers: int = 4, max_in_flight: int | None = None,
+                     use_processes: bool = False) -> "Pipeline":
+        # Потоки - для ввода-вывода (сеть, диск), процессы - для вычислений
+        # (func должна быть функцией уровня модуля). Порядок результатов сохраняется,
+        # одновременно в работе не больше max_in_flight элементов
+        limit = max_in_flight or 2 * workers
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+        def results(iterator):
+            with executor_class(max_workers=workers) as pool:
+                pending = deque()
+                for item in iterator:
+                    pending.append(pool.submit(func, item))
+                    if len(pending) >= limit:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+        return Pipeline(results(iter(self._source)))
+
+    def to_list(self) -> list:
+        return list(self._source)
+
+# Использование
+print(Pipeline(CountDown(10)).filter(lambda n: n % 2).map(lambda n: n * n).to_list())
+# [81, 49, 25, 9, 1]
+print(Pipeline(InfiniteCounter()).window(3).map(sum).take(3).to_list())  # [6, 9, 12]
+
+# with BufferedFileReader("access.log") as reader:
+#     errors = (Pipeline(reader)
+#               .filter(lambda line: "ERROR" in line)
+#               .dedupe(max_seen=100_000)
+#               .batch(1000)
+#               .parallel_map(send_to_server, workers=8))
+#     for response in errors:
+#         print(response)
+
+# 5.3.1 Пропускная способность конвейера
+def benchmark_pipeline(count: int = 1_000_000):
+    import time
+
+    start = time.perf_counter()
+    total = sum(Pipeline(range(count)).map(lambda n: n * 2).filter(lambda n: n % 3).batch(100).map(len))
+    elapsed = time.perf_counter() - start
+    print(f"map/filter/batch: {count / elapsed:,.0f} элементов/с (итог {total})")
+
+    def slow_io(n):
+        time.sleep(0.001)  # Имитация сетевого запроса
+        return n
+
+    items = 2000
+    for workers in (1, 8, 32):
+        start = time.perf_counter()
+        for _ in Pipeline(range(items)).parallel_map(slow_io, workers=workers):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"parallel_map, потоков {workers:>2}: {items / elapsed:,.0f} элементов/с")
+
+# benchmark_pipeline()
+
 """
 КЛЮЧЕВЫЕ ТЕЗИСЫ:
 1. Итераторы:
@@ -105,6 +105,144 @@ def handle_request(request):
         case {"method": _, "path": _}:
             return "Неизвестный запрос"
 
+# 5.1.1 Скомпилированная таблица маршрутов
+# match проверяет case по очереди: чем больше маршрутов, тем дольше поиск.
+# Router раскладывает правила (метод, путь) по словарю для статических путей
+# и по дереву (trie) сегментов для путей с параметрами ("/users/{id}").
+# Время поиска зависит от длины пути, а не от числа маршрутов;
+# при нескольких подходящих правилах побеждает объявленное раньше (как в match)
+class Router:
+    def __init__(self, default=None):
+        self.default = default or (lambda request: "Неизвестный запрос")
+        self._static = {}    # (метод, путь) -> (порядок, обработчик)
+        # Узел дерева: {"static": {сегмент: узел}, "param": узел, "methods": {метод: правило}};
+        # ветка параметра одна и без имени, имена хранятся в правиле:
+        # (порядок, обработчик, (имя1, имя2, ...)) - так "/users/{user_id}" и
+        # "/users/{name}/posts" уживаются в одном дереве
+        self._root = {}
+        self._count = 0
+        self._static_wildcards = False
+        self._first_param_route = float("inf")
+
+    def add(self, method, path, handler):
+        # method="*" - любой метод (аналог "method": _)
+        order = self._count
+        self._count += 1
+        segments = [segment for segment in path.split("/") if segment]
+        if not any(segment.startswith("{") for segment in segments):
+            self._static_wildcards = self._static_wildcards or method == "*"
+            self._static.setdefault((method, "/" + "/".join(segments)), (order, handler))
+            return self
+        self._first_param_route = min(self._first_param_route, order)
+        node = self._root
+        names = []
+        for segment in segments:
+            if segment.startswith("{") and segment.endswith("}"):
+                names.append(segment[1:-1])
+                node = node.setdefault("param", {})
+            else:
+                node = node.setdefault("static", {}).setdefault(segment, {})
+        node.setdefault("methods", {}).setdefault(method, (order, handler, tuple(names)))
+        return self
+
+    def route(self, method, path):
+        # Декоратор: @router.route("GET", "/users/{id}")
+        def decorator(handler):
+            self.add(method, path, handler)
+            return handler
+        return decorator
+
+    def _search(self, node, segments, index, method, values):
+        # Обход дерева: на каждом уровне не больше двух веток (статическая и параметр)
+        if index == len(segments):
+            methods = node.get("methods", {})
+            candidates = [methods[key] for key in (method, "*") if key in methods]
+            if not candidates:
+                return None
+            order, handler, names = min(candidates, key=lambda item: item[0])
+            return order, handler, dict(zip(names, values))
+        best = None
+        child = node.get("static", {}).get(segments[index])
+        if child is not None:
+            best = self._search(child, segments, index + 1, method, values)
+        child = node.get("param")
+        if child is not None:
+            values.append(segments[index])
+            found = self._search(child, segments, index + 1, method, values)
+            values.pop()
+            if found and (best is None or found[0] < best[0]):
+                best = found
+        return best
+
+    def resolve(self, method, path):
+        # Возвращает (обработчик, параметры) или (None, {})
+        path = "/" + "/".join(segment for segment in path.split("/") if segment)
+        static = self._static.get((method, path))
+        if self._static_wildcards:
+            wildcard = self._static.get(("*", path))
+            if wildcard and (static is None or wildcard[0] < static[0]):
+                static = wildcard
+        if static and static[0] < self._first_param_route:
+            return static[1], {}  # Быстрый путь: один поиск в словаре
+        found = self._search(self._root, path.split("/")[1:], 0, method, []) if path != "/" else None
+        if found and (static is None or found[0] < static[0]):
+            return found[1], found[2]
+        return (static[1], {}) if static else (None, {})
+
+    def dispatch(self, request):
+        handler, params = self.resolve(request["method"], request["path"])
+        if handler is None:
+            return self.default(request)
+        return handler(request, **params)
+
+router = Router()
+router.add("GET", "/users", lambda request: "Список пользователей")
+router.add("POST", "/login", lambda request: "Авторизация")
+
+@router.route("GET", "/users/{user_id}")
+def get_user(request, user_id):
+    return f"Пользователь {user_id}"
+
+print(router.dispatch({"method": "GET", "path": "/users"}))      # Список пользователей
+print(router.dispatch({"method": "GET", "path": "/users/42"}))   # Пользователь 42
+print(router.dispatch({"method": "PUT", "path": "/unknown"}))    # Неизвестный запрос
+
+# 5.1.2 Сравнение с match при 10, 100 и 10 000 маршрутах
+def benchmark_router(route_counts=(10, 100, 10_000), lookups=100_000):
+    import random
+    import time
+
+    for count in route_counts:
+        paths = [f"/api/resource{i}/items" for i in range(count)]
+        # match-версия генерируется: по одному case на маршрут, как в handle_request
+        source = "def handle(request):\n    match request:\n" + "".join(
+            f"        case {{'method': 'GET', 'path': {path!r}}}:\n            return {i}\n"
+            for i, path in enumerate(paths)
+        )
+        namespace = {}
+        exec(source, namespace)
+        handle = namespace["handle"]
+
+        table = Router()
+        for i, path in enumerate(paths):
+            table.add("GET", path, lambda request, i=i: i)
+
+        requests = [{"method": "GET", "path": random.choice(paths)} for _ in range(lookups)]
+        start = time.perf_counter()
+        for request in requests:
+            handle(request)
+        matched = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for request in requests:
+            table.dispatch(request)
+        routed = time.perf_counter() - start
+
+        print(f"{count:>6} маршрутов: match {lookups / matched:>12,.0f} запросов/с, "
+              f"Router {lookups / routed:>12,.0f} запросов/с (x{matched / routed:.1f})")
+
+# benchmark_router()
+
 # 5.2 Валидация данных
 def validate(data):
     match data:
@@ -113,15 +251,216 @@ def validate(data):
         case _:
             return False
 
+# 5.2.1 Компилируемые схемы для пакетной валидации
+# validate() проверяет одну жестко заданную структуру. compile_schema превращает
+# декларативную схему в специализированную функцию один раз (исходный код
+# генерируется и компилируется через exec), а validate_many проверяет миллионы
+# записей и возвращает коды ошибок без исключения на каждую запись.
+# Схема - словарь {поле: правило}, правило:
+#   int / str / float / (int, float)            - тип
+#   {"type": int, "min": 0, "max": 150}          - тип и диапазон (для str/list - длина)
+#   {"type": str, "required": False}             - необязательное поле
+#   {"name": str, ...}                           - вложенный словарь
+#   [правило] или {"type": list, "items": правило} - список элементов
+VALID, ERR_NOT_DICT, ERR_MISSING, ERR_TYPE, ERR_RANGE = 0, 1, 2, 3, 4
+ERROR_NAMES = {VALID: "ok", ERR_NOT_DICT: "не словарь", ERR_MISSING: "нет поля",
+               ERR_TYPE: "неверный тип", ERR_RANGE: "вне диапазона"}
+_MISSING = object()
+_LOCAL = object()  # Метка в namespace: имя занято локальной переменной check()
+
+def _normalize_rule(rule):
+    if isinstance(rule, list):
+        return {"type": list, "items": rule[0]}
+    if isinstance(rule, dict) and "type" not in rule:
+        return {"type": dict, "fields": rule}
+    if not isinstance(rule, dict):
+        return {"type": rule}
+    return rule
+
+def _emit_rule(rule, value, lines, indent, namespace):
+    # Дописывает в lines проверки значения переменной value по правилу
+    rule = _normalize_rule(rule)
+    pad = "    " * indent
+    kind = rule["type"]
+    if kind is dict:
+        lines.append(f"{pad}if not isinstance({value}, dict): return {ERR_TYPE}")
+        for field, field_rule in rule["fields"].items():
+            field_rule = _normalize_rule(field_rule)
+            var = f"v{len(namespace)}"
+            namespace[var] = _LOCAL  # Резервируем уникальное имя переменной
+            lines.append(f"{pad}{var} = {value}.get({field!r}, _MISSING)")
+            if field_rule.get("required", True):
+                lines.append(f"{pad}if {var} is _MISSING: return {ERR_MISSING}")
+                _emit_rule(field_rule, var, lines, indent, namespace)
+            else:
+                lines.append(f"{pad}if {var} is not _MISSING:")
+                _emit_rule(field_rule, var, lines, indent + 1, namespace)
+        return
+    type_name = f"T{len(namespace)}"
+    namespace[type_name] = kind
+    lines.append(f"{pad}if not isinstance({value}, {type_name}): return {ERR_TYPE}")
+    measure = f"len({value})" if kind in (str, list) else value
+    # Границы, как и типы, передаются через namespace: repr у Decimal/datetime - не литерал
+    for key, op in (("min", "<"), ("max", ">")):
+        if key in rule:
+            bound = f"B{len(namespace)}"
+            namespace[bound] = rule[key]
+            lines.append(f"{pad}if {measure} {op} {bound}: return {ERR_RANGE}")
+    if kind is list and "items" in rule:
+        item = f"i{len(namespace)}"
+        namespace[item] = _LOCAL
+        lines.append(f"{pad}for {item} in {value}:")
+        _emit_rule(rule["items"], item, lines, indent + 1, namespace)
+
+def compile_schema(schema):
+    # Возвращает функцию check(record) -> код ошибки (0 - запись корректна)
+    namespace = {"_MISSING": _MISSING}
+    lines = ["def check(record):", f"    if not isinstance(record, dict): return {ERR_NOT_DICT}"]
+    _emit_rule({"type": dict, "fields": schema}, "record", lines, 1, namespace)
+    lines.append(f"    return {VALID}")
+    namespace = {key: value for key, value in namespace.items() if value is not _LOCAL}
+    exec("\n".join(lines), namespace)
+    return namespace["check"]
+
+def validate_many(check, records):
+    # bytearray кодов ошибок, по байту на запись
+    return bytearray(map(check, records))
+
+USER_SCHEMA = compile_schema({"name": str, "age": {"type": int, "min": 0}})
+print(USER_SCHEMA({"name": "Анна", "age": 28}))   # 0
+print(list(validate_many(USER_SCHEMA, [{"name": "Иван", "age": -1}, {"age": 5}, "строка"])))  # [4, 2, 1]
+
+# order_check = compile_schema({
+#     "id": int,
+#     "customer": {"name": {"type": str, "min": 1}, "email": {"type": str, "required": False}},
+#     "items": [{"sku": str, "qty": {"type": int, "min": 1, "max": 1000}}],
+# })
+
+# 5.2.2 Сравнение с match-case
+def benchmark_validate(count=1_000_000):
+    import time
+    records = [{"name": f"user{i}", "age": i % 120 - 10} for i in range(count)]
+
+    start = time.perf_counter()
+    matched = [validate(record) for record in records]
+    plain = time.perf_counter() - start
+
+    start = time.perf_counter()
+    codes = validate_many(USER_SCHEMA, records)
+    compiled = time.perf_counter() - start
+
+    assert matched == [code == VALID for code in codes]
+    print(f"validate() (match): {count / plain:,.0f} записей/с")
+    print(f"compile_schema:     {count / compiled:,.0f} записей/с (x{plain / compiled:.1f})")
+
+# benchmark_validate()
+
 # 5.3 Обработка математических выражений
 expression = ("add", 3, ("sub", 5, 2))
-match expression:
-    case ("add", a, b):
-        result = a + b
-    case ("sub", a, b):
-        result = a - b
-    case _:
-        raise ValueError("Неизвестная операция")
+
+# Вложенные выражения требуют рекурсии: на глубоких деревьях
+# (тысячи уровней) она упирается в RecursionError
+def evaluate_recursive(expression):
+    match expression:
+        case ("add", a, b):
+            return evaluate_recursive(a) + evaluate_recursive(b)
+        case ("sub", a, b):
+            return evaluate_recursive(a) - evaluate_recursive(b)
+        case int() | float():
+            return expression
+        case _:
+            raise ValueError("Неизвестная операция")
+
+result = evaluate_recursive(expression)
+print(result)  # 6
+
+# 5.3.1 Компиляция выражения в плоскую программу
+# compile_expression обходит дерево без рекурсии (явный стек) и превращает его
+# в список инструкций (функция, регистры аргументов, регистр результата).
+# Вместо стека значений используются регистры: поддерево, которое встречается
+# в выражении несколько раз (один и тот же объект), вычисляется один раз.
+# Строки в выражении - переменные, их значения передаются при вычислении
+import operator
+
+OPERATIONS = {
+    "add": operator.add, "sub": operator.sub, "mul": operator.mul,
+    "div": operator.truediv, "pow": operator.pow, "neg": operator.neg,
+    "min": min, "max": max,
+}
+
+class Program:
+    def __init__(self, instructions, registers, variables, result):
+        self.instructions = instructions
+        self.registers = registers      # Шаблон: константы уже на своих местах
+        self.variables = variables      # Имя переменной -> номер регистра
+        self.result = result
+
+    def evaluate(self, bindings=None, **kwargs):
+        # Значения переменных - числа или массивы NumPy (тогда вычисление векторное)
+        bindings = {**(bindings or {}), **kwargs}
+        registers = self.registers.copy()
+        for name, index in self.variables.items():
+            try:
+                registers[index] = bindings[name]
+            except KeyError:
+                raise NameError(f"Не задана переменная {name!r}") from None
+        for func, args, out in self.instructions:
+            registers[out] = func(*[registers[i] for i in args])
+        return registers[self.result]
+
+    def evaluate_many(self, rows):
+        # Одна скомпилированная программа на много наборов значений
+        return [self.evaluate(row) for row in rows]
+
+def compile_expression(expression):
+    registers = []
+    slots = {}      # id(поддерева) -> регистр
+    constants = {}  # (тип, значение) -> регистр
+    variables = {}
+    instructions = []
+
+    def register_of(node):
+        if isinstance(node, tuple):
+            return slots[id(node)]
+        if isinstance(node, str):
+            if node not in variables:
+                variables[node] = len(registers)
+                registers.append(None)
+            return variables[node]
+        key = (node.__class__, node)  # type переопределен в примере 2.1
+        if key not in constants:
+            constants[key] = len(registers)
+            registers.append(node)
+        return constants[key]
+
+    stack = [(expression, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if not isinstance(node, tuple) or id(node) in slots:
+            continue
+        if not children_done:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node[1:]))
+            continue
+        operation, *args = node
+        if operation not in OPERATIONS:
+            raise ValueError(f"Неизвестная операция: {operation}")
+        slots[id(node)] = len(registers)
+        registers.append(None)
+        instructions.append((OPERATIONS[operation], tuple(map(register_of, args)), slots[id(node)]))
+
+    return Program(instructions, registers, variables, register_of(expression))
+
+program = compile_expression(("add", "x", ("mul", ("sub", 5, 2), "y")))
+print(program.evaluate(x=1, y=10))                                  # 31
+print(program.evaluate_many([{"x": 0, "y": 1}, {"x": 2, "y": 2}]))  # [3, 8]
+
+# deep = 0
+# for i in range(100_000):
+#     deep = ("add", deep, 1)   # evaluate_recursive(deep) -> RecursionError
+# print(compile_expression(deep).evaluate())  # 100000
+# import numpy as np
+# print(program.evaluate(x=np.arange(5), y=np.ones(5)))  # Векторно по массивам
 
 """
 КЛЮЧЕВЫЕ ТЕЗИСЫ: